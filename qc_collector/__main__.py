@@ -1,17 +1,60 @@
 #!/usr/bin/env python
 
 import argparse
+import concurrent.futures
 import datetime
 import json
 import logging
 import os
+import signal
 import time
+import traceback
 
 import qc_collector.config
+import qc_collector.json_io
 import qc_collector.core as core
 
 DEFAULT_SCAN_INTERVAL_SECONDS = 3600.0
 
+
+def configure_logging(log_level: int):
+    """
+    Configure JSON Lines-formatted logging on the root logger.
+
+    :param log_level: Log level, eg. `logging.INFO`.
+    :type log_level: int
+    :return: None
+    :rtype: None
+    """
+    logging.basicConfig(
+        format='{"timestamp": "%(asctime)s.%(msecs)03d", "level": "%(levelname)s", "module": "%(module)s", "function_name": "%(funcName)s", "line_num": %(lineno)d, "message": %(message)s}',
+        datefmt='%Y-%m-%dT%H:%M:%S',
+        encoding='utf-8',
+        level=log_level,
+    )
+
+    return None
+
+
+def init_collect_outputs_worker(log_level: int):
+    """
+    Initialize a worker process for collecting outputs.
+
+    Workers ignore SIGINT so that a KeyboardInterrupt is only handled by the
+    main process, which lets in-progress collections finish before quitting.
+    With the 'spawn' start method workers don't inherit the main process' logging
+    setup, so it's configured here. With 'fork' this is a no-op.
+
+    :param log_level: Log level, eg. `logging.INFO`.
+    :type log_level: int
+    :return: None
+    :rtype: None
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_logging(log_level)
+
+    return None
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('-c', '--config')
@@ -26,12 +69,7 @@ def main():
     except AttributeError as e:
         log_level = logging.INFO
 
-    logging.basicConfig(
-        format='{"timestamp": "%(asctime)s.%(msecs)03d", "level": "%(levelname)s", "module": "%(module)s", "function_name": "%(funcName)s", "line_num": %(lineno)d, "message": %(message)s}',
-        datefmt='%Y-%m-%dT%H:%M:%S',
-        encoding='utf-8',
-        level=log_level,
-    )
+    configure_logging(log_level)
     logging.debug(json.dumps({"event_type": "debug_logging_enabled"}))
 
     quit_when_safe = False
@@ -55,22 +93,51 @@ def main():
 
             runs = core.find_runs(config)
             runs_output_file = os.path.join(config['output_dir'], 'sequencing_runs.json')
-            with open(runs_output_file, 'w') as f:
-                json.dump(runs, f, indent=2)
-                f.write('\n')
+            qc_collector.json_io.write_json(runs_output_file, runs)
 
             logging.info(json.dumps({"event_type": "write_runs_file_complete", "runs_file": runs_output_file}))
 
-            for run in core.scan(config):
-                if run is not None:
+            # Collecting outputs is mostly CSV parsing, which is CPU-bound, and
+            # each run is written to its own output file. So runs are collected
+            # in parallel in separate processes.
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                initializer=init_collect_outputs_worker,
+                initargs=(log_level,),
+            )
+            try:
+                futures = {}
+                for run in core.scan(config):
+                    if run is not None:
+                        try:
+                            config = qc_collector.config.load_config(args.config)
+                            logging.info(json.dumps({"event_type": "config_loaded", "config_file": os.path.abspath(args.config)}))
+                        except json.decoder.JSONDecodeError as e:
+                            logging.error(json.dumps({"event_type": "load_config_failed", "config_file": os.path.abspath(args.config)}))
+                        # Each run is collected with the config as it was when
+                        # the run was submitted.
+                        future = executor.submit(core.collect_outputs, config, run)
+                        futures[future] = run
+                    if quit_when_safe:
+                        exit(0)
+                for future in concurrent.futures.as_completed(futures):
                     try:
-                        config = qc_collector.config.load_config(args.config)
-                        logging.info(json.dumps({"event_type": "config_loaded", "config_file": os.path.abspath(args.config)}))
-                    except json.decoder.JSONDecodeError as e:
-                        logging.error(json.dumps({"event_type": "load_config_failed", "config_file": os.path.abspath(args.config)}))
-                    core.collect_outputs(config, run)
-                if quit_when_safe:
-                    exit(0)
+                        future.result()
+                    except Exception as e:
+                        # A problem with one run's outputs shouldn't stop the
+                        # remaining runs from being collected. The traceback is
+                        # included in the message so that the log stays JSON Lines.
+                        logging.error(json.dumps({
+                            "event_type": "collect_outputs_failed",
+                            "analysis_dir_path": futures[future]['path'],
+                            "error": repr(e),
+                            "traceback": "".join(traceback.format_exception(type(e), e, e.__traceback__)),
+                        }))
+            finally:
+                # On KeyboardInterrupt, let in-progress collections finish but
+                # don't start any new ones.
+                executor.shutdown(wait=True, cancel_futures=True)
+
             scan_complete_timestamp = datetime.datetime.now()
             scan_duration_delta = scan_complete_timestamp - scan_start_timestamp
             scan_duration_seconds = scan_duration_delta.total_seconds()
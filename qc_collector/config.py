@@ -1,17 +1,17 @@
-import json
 import csv
 
+import qc_collector.json_io as json_io
+
 
 def get_excluded_runs(config):
     """
     Load the list of excluded runs.
     """
-    excluded_runs = set()
     with open(config['excluded_runs_list'], 'r') as f:
-        for line in f.readlines():
-            if not line.startswith('#'):
-                run_id = line.strip()
-                excluded_runs.add(run_id)
+        excluded_runs = frozenset(
+            line.strip() for line in f
+            if not line.startswith('#') and line.strip()
+        )
 
     return excluded_runs
 
@@ -20,14 +20,13 @@ def load_config(config_path: str) -> dict[str, object]:
     """
     Load the config file. If an `excluded_runs_list` is included in the config, load that too.
     """
-    with open(config_path, 'r') as f:
-        config = json.load(f)
+    config = json_io.read_json(config_path)
 
     if 'excluded_runs_list' in config:
         excluded_runs = get_excluded_runs(config)
         config['excluded_runs'] = excluded_runs
     else:
-        config['excluded_runs'] = set()
+        config['excluded_runs'] = frozenset()
 
 
     return config
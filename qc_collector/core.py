@@ -10,8 +10,39 @@ import shutil
 from pathlib import Path
 from typing import Iterator, Optional
 
+import qc_collector.json_io as json_io
 import qc_collector.parsers as parsers
 
+# Encoder for log message payloads. Same output as `json.dumps` with default
+# arguments, but skips its per-call argument handling.
+_dumps = json.JSONEncoder().encode
+
+# Full run-ID formats, used to identify analysis directories that are ready to collect.
+_MISEQ_RE = re.compile(r"\d{6}_M\d{5}_\d+_\d{9}-[A-Z0-9]{5}")
+_NEXTSEQ_RE = re.compile(r"\d{6}_VH\d{5}_\d+_[A-Z0-9]{9}")
+_GRIDION_RE = re.compile(r"\d{8}_\d{4}_X\d+_[A-Z0-9]{8}_[a-z0-9]{8}")
+
+# Run-ID prefixes, used when listing all runs. The name of the group that
+# matched is the sequencer type.
+_RUN_ID_PREFIX_RE = re.compile(
+    r"(?P<miseq>\d{6}_M\d{5}_)"
+    r"|(?P<nextseq>\d{6}_VH\d{5}_)"
+    r"|(?P<nanopore>\d{8}_\d{4}_)"
+)
+
+# Globs used to find QC outputs, relative to an analysis directory.
+_FASTP_GLOB = '*/*_fastp.csv'
+_QUAST_GLOB = '*/*_quast.csv'
+
+# Conditions that an analysis directory must meet before it is collected,
+# in the order that they are checked.
+_ANALYSIS_DIR_CONDITIONS = (
+    "is_directory",
+    "matches_recognized_run_id_format",
+    "not_excluded",
+    "ready_to_collect",
+)
+
 
 def create_output_dirs(config: dict):
     """
@@ -30,8 +61,7 @@ def create_output_dirs(config: dict):
         # os.path.join(base_outdir, 'another-output'),
     ]
     for output_dir in output_dirs:
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
 
     return None
 
@@ -45,68 +75,69 @@ def find_analysis_dirs(config: dict):
     :return: List of analysis directories.
     :rtype: Iterator[dict]
     """
-    miseq_run_id_regex = "\\d{6}_M\\d{5}_\\d+_\\d{9}-[A-Z0-9]{5}"
-    nextseq_run_id_regex = "\\d{6}_VH\\d{5}_\\d+_[A-Z0-9]{9}"
-    gridion_run_id_regex = "\\d{8}_\\d{4}_X\\d+_[A-Z0-9]{8}_[a-z0-9]{8}"
-
     analysis_by_run_dir = config['analysis_by_run_dir']
-    subdirs = os.scandir(analysis_by_run_dir)
-
-    for subdir in subdirs:
-        run_id = subdir.name
-        matches_miseq_regex = re.match(miseq_run_id_regex, run_id)
-        matches_nextseq_regex = re.match(nextseq_run_id_regex, run_id)
-        matches_gridion_regex = re.match(gridion_run_id_regex, run_id)
-        sequencer_type = None
-        if matches_miseq_regex:
-            sequencer_type = 'miseq'
-        elif matches_nextseq_regex:
-            sequencer_type = 'nextseq'
-        elif matches_gridion_regex:
-            sequencer_type = 'gridion'
-        not_excluded = run_id not in config['excluded_runs']
-        ready_to_collect = False
-
-        # Adjust this path as necessary to 
-        analysis_complete_path = os.path.join(subdir, 'analysis_complete.json')
-        analysis_complete = os.path.exists(analysis_complete_path)
-        ready_to_collect = analysis_complete
-
-        matches_recognized_run_id_format = (
-            (matches_miseq_regex is not None) or
-            (matches_nextseq_regex is not None) or
-            (matches_gridion_regex is not None)
-        )
-        conditions_checked = {
-            "is_directory": subdir.is_dir(),
-            "matches_recognized_run_id_format": matches_recognized_run_id_format,
-            "not_excluded": not_excluded,
-            "ready_to_collect": ready_to_collect,
-        }
-        
-        conditions_met = list(conditions_checked.values())
-
-        analysis_directory_path = os.path.abspath(subdir.path)
-        analysis_dir = {
-            "path": analysis_directory_path,
-            "sequencer_type": sequencer_type,
-        }
-        
-        if all(conditions_met):
-            logging.info(json.dumps({
-                "event_type": "analysis_directory_found",
-                "sequencing_run_id": run_id,
-                "analysis_directory_path": analysis_directory_path
-            }))
+    excluded_runs = config['excluded_runs']
+    # Log payloads for each entry are only serialized if they would actually be emitted.
+    root_logger = logging.getLogger()
+
+    with os.scandir(analysis_by_run_dir) as subdirs:
+        for subdir in subdirs:
+            run_id = subdir.name
+
+            # Conditions are checked from cheapest to most expensive, and we stop
+            # at the first one that isn't met.
+            sequencer_type = None
+            failed_condition = None
+            if not subdir.is_dir():
+                failed_condition = "is_directory"
+            elif _MISEQ_RE.match(run_id):
+                sequencer_type = 'miseq'
+            elif _NEXTSEQ_RE.match(run_id):
+                sequencer_type = 'nextseq'
+            elif _GRIDION_RE.match(run_id):
+                sequencer_type = 'gridion'
+            else:
+                failed_condition = "matches_recognized_run_id_format"
+
+            if failed_condition is None and run_id in excluded_runs:
+                failed_condition = "not_excluded"
+
+            if failed_condition is None:
+                # Adjust this path as necessary to 
+                analysis_complete_path = subdir.path + os.sep + 'analysis_complete.json'
+                if not os.path.isfile(analysis_complete_path):
+                    failed_condition = "ready_to_collect"
+
+            if failed_condition is not None:
+                if root_logger.isEnabledFor(logging.DEBUG):
+                    # Conditions after the failed one were never checked, so
+                    # they're left out.
+                    num_checked = _ANALYSIS_DIR_CONDITIONS.index(failed_condition) + 1
+                    conditions_checked = {
+                        condition: condition != failed_condition
+                        for condition in _ANALYSIS_DIR_CONDITIONS[:num_checked]
+                    }
+                    logging.debug(_dumps({
+                        "event_type": "directory_skipped",
+                        "analysis_directory_path": os.path.abspath(subdir.path),
+                        "conditions_checked": conditions_checked
+                    }))
+                yield None
+                continue
+
+            analysis_directory_path = os.path.abspath(subdir.path)
+            analysis_dir = {
+                "path": analysis_directory_path,
+                "sequencer_type": sequencer_type,
+            }
+            if root_logger.isEnabledFor(logging.INFO):
+                logging.info(_dumps({
+                    "event_type": "analysis_directory_found",
+                    "sequencing_run_id": run_id,
+                    "analysis_directory_path": analysis_directory_path
+                }))
 
             yield analysis_dir
-        else:
-            logging.debug(json.dumps({
-                "event_type": "directory_skipped",
-                "analysis_directory_path": os.path.abspath(subdir.path),
-                "conditions_checked": conditions_checked
-            }))
-            yield None
 
 
 def find_runs(config):
@@ -118,33 +149,25 @@ def find_runs(config):
     :return: List of runs. Keys: ['run_id', 'sequencer_type']
     :rtype: list[dict[str, str]]
     """
-    logging.info(json.dumps({"event_type": "find_runs_start"}))
+    logging.info(_dumps({"event_type": "find_runs_start"}))
     runs = []
-    all_analysis_dirs = sorted(list(os.listdir(config['analysis_by_run_dir'])))
-    illumina_run_ids = filter(lambda x: re.match('\\d{6}_[VM]', x) != None, all_analysis_dirs)
-    nanopore_run_ids = filter(lambda x: re.match('\\d{8}_\\d{4}_', x) != None, all_analysis_dirs)
-    all_run_ids = sorted(list(illumina_run_ids) + list(nanopore_run_ids))
-    for run_id in all_run_ids:
-        if run_id in config['excluded_runs']:
-            continue
-
-        sequencer_type = None
-        if re.match('\\d{6}_M\\d{5}_', run_id):
-            sequencer_type = 'miseq'
-        elif re.match('\\d{6}_VH\\d{5}_', run_id):
-            sequencer_type = 'nextseq'
-        elif re.match('\\d{8}_\\d{4}_', run_id):
-            sequencer_type = 'nanopore'
-
-        analysis_dir = os.path.join(config['analysis_by_run_dir'], run_id)
-
-        run = {
-            'run_id': run_id,
-            'sequencer_type': sequencer_type,
-        }
-        runs.append(run)
-
-    logging.info(json.dumps({
+    excluded_runs = config['excluded_runs']
+    with os.scandir(config['analysis_by_run_dir']) as entries:
+        for entry in entries:
+            run_id = entry.name
+            run_id_match = _RUN_ID_PREFIX_RE.match(run_id)
+            if run_id_match is None or run_id in excluded_runs:
+                continue
+
+            run = {
+                'run_id': run_id,
+                'sequencer_type': run_id_match.lastgroup,
+            }
+            runs.append(run)
+
+    runs.sort(key=lambda run: run['run_id'])
+
+    logging.info(_dumps({
         "event_type": "find_runs_complete"
     }))
 
@@ -160,12 +183,71 @@ def scan(config: dict[str, object]) -> Iterator[Optional[dict[str, str]]]:
     :return: A run directory to analyze, or None
     :rtype: Iterator[Optional[dict[str, object]]]
     """
-    logging.info(json.dumps({"event_type": "scan_start"}))
+    logging.info(_dumps({"event_type": "scan_start"}))
     for analysis_dir in find_analysis_dirs(config):    
         yield analysis_dir
 
     
     
+def is_outdated(dst_path: str, src_paths: list) -> bool:
+    """
+    Check whether an output file needs to be (re-)generated from its inputs.
+    An output is outdated if it doesn't exist, if any of its inputs have been
+    modified or created more recently than it was, or if an input disappears
+    before it can be checked.
+
+    Inputs are compared by the later of their mtime and ctime, since tools like
+    `rsync -a` and `cp -p` preserve the original mtime when copying in new files.
+
+    :param dst_path: Path to the output file.
+    :type dst_path: str
+    :param src_paths: Paths to the input files (or directories) that the output is generated from.
+    :type src_paths: list[str]
+    :return: True if the output needs to be (re-)generated.
+    :rtype: bool
+    """
+    try:
+        dst_mtime_ns = os.stat(dst_path).st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+    for src_path in src_paths:
+        try:
+            src_stat = os.stat(src_path)
+        except FileNotFoundError:
+            # The input was removed or renamed after it was found, so
+            # re-generate from whatever inputs exist now.
+            return True
+        if max(src_stat.st_mtime_ns, src_stat.st_ctime_ns) > dst_mtime_ns:
+            return True
+
+    return False
+
+
+def find_input_dirs(analysis_dir_path: str) -> list[str]:
+    """
+    Find the directories that are searched for QC outputs: the analysis directory
+    itself and its (non-hidden) subdirectories, matching the `*/` in `_FASTP_GLOB`
+    and `_QUAST_GLOB`.
+
+    Deleting, adding or renaming a file updates the mtime of the directory that
+    contains it, so checking these directories with `is_outdated` catches inputs
+    that have been removed since the output was generated.
+
+    :param analysis_dir_path: Path to the analysis directory.
+    :type analysis_dir_path: str
+    :return: Paths of the analysis directory and its subdirectories.
+    :rtype: list[str]
+    """
+    input_dirs = [analysis_dir_path]
+    with os.scandir(analysis_dir_path) as entries:
+        for entry in entries:
+            if not entry.name.startswith('.') and entry.is_dir():
+                input_dirs.append(entry.path)
+
+    return input_dirs
+
+
 def collect_outputs(config: dict[str, object], analysis_dir: Optional[dict[str, str]]):
     """
     Collect QC outputs for a specific analysis dir.
@@ -179,7 +261,7 @@ def collect_outputs(config: dict[str, object], analysis_dir: Optional[dict[str,
     """
     # Short-circuit if `analysis_dir` is None
     if not analysis_dir:
-        logging.warning(json.dumps({
+        logging.warning(_dumps({
             "event_type": "collect_outputs_skipped",
             "analysis_dir": analysis_dir,
         }))
@@ -191,54 +273,55 @@ def collect_outputs(config: dict[str, object], analysis_dir: Optional[dict[str,
     # library-qc
     library_qc_by_library_id = {}
     library_qc_dst_file = os.path.join(config['output_dir'], "library-qc", run_id + "_library_qc.json")
-    # If the library QC for the run already exists, we don't re-generate.
-    # Remove the existing library QC from the output dir to trigger re-generation.
-    if not os.path.exists(library_qc_dst_file):
-        # fastp is a raw sequence QC tool that we use in many pipelines.
-        # You can remove this if you don't use fastp in your analysis.
-        #
-        # You may need to adjust this glob, or add additional logic to check
-        # for specific output directories.
-        fastp_output_glob = os.path.join(analysis_dir['path'], '*', '*_fastp.csv')
-        fastp_paths = glob.glob(fastp_output_glob)
+
+    # fastp is a raw sequence QC tool that we use in many pipelines.
+    # You can remove this if you don't use fastp in your analysis.
+    #
+    # You may need to adjust `_FASTP_GLOB`, or add additional logic to check
+    # for specific output directories.
+    fastp_paths = glob.glob(os.path.join(analysis_dir['path'], _FASTP_GLOB))
+
+    # QUAST is an assembly QC tool that we use in many pipelines.
+    # You can remove this if you don't use QUAST in your analysis
+    quast_paths = glob.glob(os.path.join(analysis_dir['path'], _QUAST_GLOB))
+
+    # If the library QC for the run already exists, we only re-generate it if
+    # any of the QC outputs that it is built from have been modified, or if
+    # files have been added, removed or renamed in the directories they're
+    # found in, since it was written. If you change the globs above to search
+    # deeper than one level of subdirectories, update `find_input_dirs` too.
+    # Remove the existing library QC from the output dir to force re-generation.
+    input_paths = find_input_dirs(analysis_dir['path']) + fastp_paths + quast_paths
+    if is_outdated(library_qc_dst_file, input_paths):
         for fastp_path in fastp_paths:
-            if os.path.exists(fastp_path):
-                fastp = parsers.parse_fastp(fastp_path)
-                for fastp_record in fastp:
-                    library_id = fastp_record['sample_id']
-                    if library_id not in library_qc_by_library_id:
-                        library_qc_by_library_id[library_id] = {
-                            'library_id': library_id,
-                        }
-                    library_qc_by_library_id[library_id]['num_bases'] = fastp_record['total_bases_before_filtering']
-                    # Add any other fastp metrics you want to collect
+            fastp = parsers.parse_fastp(fastp_path)
+            for fastp_record in fastp:
+                library_id = fastp_record['sample_id']
+                library_qc = library_qc_by_library_id.setdefault(library_id, {
+                    'library_id': library_id,
+                })
+                library_qc['num_bases'] = fastp_record['total_bases_before_filtering']
+                # Add any other fastp metrics you want to collect
 
-        
-        # QUAST is an assembly QC tool that we use in many pipelines.
-        # You can remove this if you don't use QUAST in your analysis
-        quast_output_glob = os.path.join(analysis_dir['path'], '*', '*_quast.csv')
-        quast_paths = glob.glob(quast_output_glob)
         for quast_path in quast_paths:
-            if os.path.exists(quast_path):
-                quast = parsers.parse_quast(quast_path)
-                for quast_record in quast:
-                    assembly_id_split = quast_record['assembly_id'].split('_')
-                    if len(assembly_id_split) > 0:
-                        library_id = assembly_id_split[0]
-                        if library_id in library_qc_by_library_id:
-                            library_qc_by_library_id[library_id]['assembly_length'] = quast_record['total_length']
-                            library_qc_by_library_id[library_id]['assembly_num_contigs'] = quast_record['num_contigs']
-                            library_qc_by_library_id[library_id]['assembly_N50'] = quast_record['assembly_N50']
+            quast = parsers.parse_quast(quast_path)
+            for quast_record in quast:
+                # Assembly IDs are expected to be in the format: <library_id>_<assembler>
+                library_id = quast_record['assembly_id'].partition('_')[0]
+                library_qc = library_qc_by_library_id.get(library_id)
+                if library_qc is None:
+                    continue
+                library_qc['assembly_length'] = quast_record['total_length']
+                library_qc['assembly_num_contigs'] = quast_record['num_contigs']
+                library_qc['assembly_N50'] = quast_record['assembly_N50']
 
 
         # Add any other QC metric collection you'd like
         
         
-        with open(library_qc_dst_file, 'w') as f:
-            json.dump(list(library_qc_by_library_id.values()), f, indent=2)
-            f.write('\n')
+        json_io.write_json(library_qc_dst_file, list(library_qc_by_library_id.values()))
 
-        logging.info(json.dumps({
+        logging.info(_dumps({
             "event_type": "write_library_qc_complete",
             "run_id": run_id,
             "dst_file": library_qc_dst_file
@@ -246,7 +329,7 @@ def collect_outputs(config: dict[str, object], analysis_dir: Optional[dict[str,
 
         
 
-    logging.info(json.dumps({
+    logging.info(_dumps({
         "event_type": "collect_outputs_complete",
         "sequencing_run_id": run_id,
         "analysis_dir_path": analysis_dir['path']
@@ -0,0 +1,77 @@
+import json
+import math
+
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _replace_non_finite(data):
+    """
+    Replace NaN and infinite floats with None, recursing into lists and dicts.
+    The standard library writes these as `NaN`/`Infinity`, which aren't valid JSON.
+
+    :param data: Data to clean.
+    :type data: object
+    :return: Copy of the data with non-finite floats replaced by None.
+    :rtype: object
+    """
+    if isinstance(data, float):
+        return data if math.isfinite(data) else None
+    if isinstance(data, dict):
+        return {key: _replace_non_finite(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_replace_non_finite(value) for value in data]
+
+    return data
+
+
+def write_json(path: str, data: object):
+    """
+    Write data to a JSON file, indented by two spaces and with a trailing newline.
+    Uses orjson if it is installed, otherwise falls back to the standard library.
+
+    Either way, non-ASCII characters are written as UTF-8 and NaN/infinite floats
+    are written as `null`. The backends may format some floats differently
+    (eg. orjson writes `1e-05` as `0.00001`), but the values are the same.
+    Integers too large for orjson are written with the standard library.
+
+    :param path: Path to the output file.
+    :type path: str
+    :param data: Data to write. Must be JSON-serializable.
+    :type data: object
+    :return: None
+    :rtype: None
+    """
+    if orjson is not None:
+        try:
+            Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+            return None
+        except orjson.JSONEncodeError:
+            pass
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(_replace_non_finite(data), f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+    return None
+
+
+def read_json(path: str) -> object:
+    """
+    Read data from a JSON file.
+    Uses orjson if it is installed, otherwise falls back to the standard library.
+
+    :param path: Path to the file.
+    :type path: str
+    :return: Parsed data.
+    :rtype: object
+    """
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -1,4 +1,112 @@
 import csv
+import io
+
+FASTP_INT_FIELDS = (
+    'total_reads_before_filtering',
+    'total_reads_after_filtering',
+    'total_bases_before_filtering',
+    'total_bases_after_filtering',
+    'read1_mean_length_before_filtering',
+    'read1_mean_length_after_filtering',
+    'read2_mean_length_before_filtering',
+    'read2_mean_length_after_filtering',
+    'q20_bases_before_filtering',
+    'q20_bases_after_filtering',
+    'q30_bases_before_filtering',
+    'q30_bases_after_filtering',
+    'adapter_trimmed_reads',
+    'adapter_trimmed_bases',
+)
+
+FASTP_FLOAT_FIELDS = (
+    'q20_rate_before_filtering',
+    'q20_rate_after_filtering',
+    'q30_rate_before_filtering',
+    'q30_rate_after_filtering',
+    'gc_content_before_filtering',
+    'gc_content_after_filtering',
+)
+
+QUAST_INT_FIELDS = (
+    'total_length',
+    'num_contigs',
+    'largest_contig',
+    'assembly_N50',
+    'assembly_N75',
+    'assembly_L50',
+    'assembly_L75',
+    'num_contigs_gt_0_bp',
+    'num_contigs_gt_1000_bp',
+    'num_contigs_gt_5000_bp',
+    'num_contigs_gt_10000_bp',
+    'num_contigs_gt_25000_bp',
+    'num_contigs_gt_50000_bp',
+    'total_length_gt_0_bp',
+    'total_length_gt_1000_bp',
+    'total_length_gt_5000_bp',
+    'total_length_gt_10000_bp',
+    'total_length_gt_25000_bp',
+    'total_length_gt_50000_bp',
+)
+
+QUAST_FLOAT_FIELDS = (
+    'num_N_per_100_kb',
+)
+
+
+def _parse_csv(csv_path, int_fields, float_fields):
+    """
+    Parse a csv file into a list of dicts, converting the values of the
+    given fields to int or float. Values that can't be converted are set
+    to None.
+
+    :param csv_path: Path to csv file
+    :type csv_path: str
+    :param int_fields: Fields to convert to int
+    :type int_fields: tuple[str]
+    :param float_fields: Fields to convert to float
+    :type float_fields: tuple[str]
+    :return: List of dicts
+    :rtype: list
+    """
+    parsed = []
+    # QC output files are small enough to read in one call, rather than
+    # in 8 KiB chunks while the csv reader iterates over the file.
+    with open(csv_path, 'r') as f:
+        text = f.read()
+
+    reader = csv.reader(io.StringIO(text), dialect='unix')
+    header = next(reader, [])
+    num_columns = len(header)
+
+    # Look up the column index of each field to convert once, so that
+    # each row can be converted in place by position.
+    conversions = tuple(
+        [(header.index(field), int) for field in int_fields if field in header] +
+        [(header.index(field), float) for field in float_fields if field in header]
+    )
+
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < num_columns:
+            row.extend([None] * (num_columns - len(row)))
+        for idx, convert in conversions:
+            value = row[idx]
+            # Empty values are common, and raising a ValueError for each
+            # one is much slower than checking for them directly.
+            if not value:
+                row[idx] = None
+                continue
+            try:
+                row[idx] = convert(value)
+            except ValueError as e:
+                row[idx] = None
+
+        parsed.append(dict(zip(header, row)))
+
+    return parsed
+
 
 def parse_fastp(fastp_path):
     """
@@ -9,50 +117,7 @@ def parse_fastp(fastp_path):
     :return: List of dicts
     :rtype: list
     """
-    fastp = []
-    int_fields = [
-        'total_reads_before_filtering',
-        'total_reads_after_filtering',
-        'total_bases_before_filtering',
-        'total_bases_after_filtering',
-        'read1_mean_length_before_filtering',
-        'read1_mean_length_after_filtering',
-        'read2_mean_length_before_filtering',
-        'read2_mean_length_after_filtering',
-        'q20_bases_before_filtering',
-        'q20_bases_after_filtering',
-        'q30_bases_before_filtering',
-        'q30_bases_after_filtering',
-        'adapter_trimmed_reads',
-        'adapter_trimmed_bases',
-    ]
-
-    float_fields = [
-        'q20_rate_before_filtering',
-        'q20_rate_after_filtering',
-        'q30_rate_before_filtering',
-        'q30_rate_after_filtering',
-        'gc_content_before_filtering',
-        'gc_content_after_filtering',
-    ]
-    
-    with open(fastp_path, 'r') as f:
-        reader = csv.DictReader(f, dialect='unix')
-        for row in reader:
-            for field in int_fields:
-                try:
-                    row[field] = int(row[field])
-                except ValueError as e:
-                    row[field] = None
-            for field in float_fields:
-                try:
-                    row[field] = float(row[field])
-                except ValueError as e:
-                    row[field] = None
-
-            fastp.append(row)
-
-    return fastp
+    return _parse_csv(fastp_path, FASTP_INT_FIELDS, FASTP_FLOAT_FIELDS)
 
 
 def parse_quast(quast_path):
@@ -64,47 +129,4 @@ def parse_quast(quast_path):
     :return: List of dicts
     :rtype: list
     """
-    quast = []
-
-    int_fields = [
-        'total_length',
-        'num_contigs',
-        'largest_contig',
-        'assembly_N50',
-        'assembly_N75',
-        'assembly_L50',
-        'assembly_L75',
-        'num_contigs_gt_0_bp',
-        'num_contigs_gt_1000_bp',
-        'num_contigs_gt_5000_bp',
-        'num_contigs_gt_10000_bp',
-        'num_contigs_gt_25000_bp',
-        'num_contigs_gt_50000_bp',
-        'total_length_gt_0_bp',
-        'total_length_gt_1000_bp',
-        'total_length_gt_5000_bp',
-        'total_length_gt_10000_bp',
-        'total_length_gt_25000_bp',
-        'total_length_gt_50000_bp',
-
-    ]
-    float_fields = [
-        'num_N_per_100_kb',
-    ]
-    with open(quast_path, 'r') as f:
-        reader = csv.DictReader(f, dialect='unix')
-        for row in reader:
-            for field in int_fields:
-                try:
-                    row[field] = int(row[field])
-                except ValueError as e:
-                    row[field] = None
-            for field in float_fields:
-                try:
-                    row[field] = float(row[field])
-                except ValueError as e:
-                    row[field] = None
-
-            quast.append(row)
-
-    return quast
+    return _parse_csv(quast_path, QUAST_INT_FIELDS, QUAST_FLOAT_FIELDS)